@@ -2,9 +2,97 @@
 
 import os
 import math
+from functools import lru_cache
+import numpy as np
+import orjson
 from pathlib import Path
+from bisect import bisect_left, bisect_right
 from typing import Dict, List, Any, Optional
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# A simple 1x1 pixel transparent PNG in base64, served until charts are implemented
+PLACEHOLDER_IMAGE_B64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z/C/HgAGgwJ/lK3Q6wAAAABJRU5ErkJggg=="
+
+# DTI categories: below 28 excellent, below 36 good, below 43 fair, below 50 poor
+_DTI_THRESHOLDS = (28, 36, 43, 50)
+_DTI_LABELS = ("excellent", "good", "fair", "poor", "critical")
+
+# Credit score categories: 580+ fair, 670+ good, 740+ excellent
+_CS_THRESHOLDS = (580, 670, 740)
+_CS_LABELS = ("poor", "fair", "good", "excellent")
+
+# Overall risk tiers, raised by a DTI above each threshold or a lower credit bucket
+_DTI_RISK_THRESHOLDS = (28, 36, 43)
+_RISK_LEVELS = ("low", "low_moderate", "moderate", "high")
+
+# Risk factor (risk_level, impact, suggestion) by credit bucket and DTI risk tier
+_RF_KEYS = ("risk_level", "impact", "suggestion")
+_CS_RISK = (
+    ("high", "negative", "Improve credit score"),
+    ("moderate", "negative", "Improve credit score"),
+    ("low", "positive", "Maintain excellent credit"),
+    ("low", "positive", "Maintain excellent credit"),
+)
+_DTI_RISK = (
+    ("low", "positive", "Maintain healthy DTI ratio"),
+    ("low", "positive", "Maintain healthy DTI ratio"),
+    ("moderate", "negative", "Reduce debt or increase income"),
+    ("high", "negative", "Reduce debt or increase income"),
+)
+
+# Payment schedule entry fields, in the order rows are built
+_PAY_KEYS = (
+    "payment_number", "payment_date", "payment_amount", "principal_payment",
+    "interest_payment", "remaining_balance", "total_interest_paid",
+)
+
+# Payment dates for the generated first-year rows
+_MONTH_STRINGS = tuple(f"2024-{month:02d}-01" for month in range(1, 13))
+
+
+def _amortize_loop(loan_amount, monthly_rate, payment, n):
+    """Return (interest, principal, balance) arrays for the first n payments"""
+    interests = np.empty(n)
+    principals = np.empty(n)
+    balances = np.empty(n)
+    balance = loan_amount
+    
+    for k in range(n):
+        interest = balance * monthly_rate
+        principal = payment - interest
+        balance -= principal
+        
+        # Handle final payment or negative balance
+        if balance <= 0:
+            principal += balance
+            balance = 0.0
+        
+        interests[k] = interest
+        principals[k] = principal
+        balances[k] = balance
+        
+        if balance <= 0:
+            return interests[:k + 1], principals[:k + 1], balances[:k + 1]
+    
+    return interests, principals, balances
+
+
+# Compile the loop when Numba is installed, otherwise run the same loop in Python
+if njit is not None:
+    _amortize = njit(cache=True)(_amortize_loop)
+else:
+    _amortize = _amortize_loop
+
+
+def warm_up():
+    """Compile the amortization kernel ahead of the first request"""
+    _amortize(1000.0, 0.005, 100.0, 12)
+
+
 class LoanSystem:
     """Simple loan calculator system that doesn't require the joblib model"""
     
@@ -12,33 +100,137 @@ class LoanSystem:
         """Initialize the loan system with simple calculation logic"""
         self.openai_available = "OPENAI_API_KEY" in os.environ
         print(f"Loan System initialized with OpenAI: {self.openai_available}")
+        
+        # Results are pure functions of the inputs, so repeat scenarios are served from cache
+        self._analyze_cached = lru_cache(maxsize=1024)(self._analyze)
+        self._metrics_cached = lru_cache(maxsize=1024)(self._compute_metrics)
+    
+    def clear_cache(self):
+        """Drop all cached loan analyses"""
+        self._analyze_cached.cache_clear()
+        self._metrics_cached.cache_clear()
     
     def analyze_loan(self, income, loan_amount, loan_term_years, interest_rate, 
-                    credit_score, monthly_debt, property_value=None, extra_payment=0):
+                    credit_score, monthly_debt, property_value=None, extra_payment=0,
+                    include_rec_html=True):
         """Analyze a loan scenario with simple calculations"""
-        # Validate inputs
+        return orjson.loads(self.analyze_loan_json(
+            income, loan_amount, loan_term_years, interest_rate, credit_score,
+            monthly_debt, property_value, extra_payment, include_rec_html
+        ))
+    
+    def analyze_loan_json(self, income, loan_amount, loan_term_years, interest_rate, 
+                          credit_score, monthly_debt, property_value=None, extra_payment=0,
+                          include_rec_html=True):
+        """Analyze a loan scenario and return the result as serialized JSON bytes"""
+        inputs = self._normalize_inputs(
+            income, loan_amount, loan_term_years, interest_rate,
+            credit_score, monthly_debt, property_value, extra_payment
+        )
+        
+        # Cached results are stored as JSON so callers can't mutate them
+        return self._analyze_cached(*inputs, include_rec_html)
+    
+    def analyze_batch(self, income, loan_amount, loan_term_years, interest_rate,
+                      credit_score, monthly_debt, property_value=None):
+        """Analyze many loan scenarios at once from parallel sequences of inputs"""
+        income = np.asarray(income, dtype=np.float64)
+        loan_amount = np.asarray(loan_amount, dtype=np.float64)
+        loan_term_years = np.asarray(loan_term_years, dtype=np.int64)
+        interest_rate = np.asarray(interest_rate, dtype=np.float64)
+        credit_score = np.asarray(credit_score, dtype=np.int64)
+        monthly_debt = np.asarray(monthly_debt, dtype=np.float64)
+        
+        # Missing property values become NaN so the loan-to-value column stays numeric
+        if property_value is None:
+            property_value = np.full(income.shape, np.nan)
+        else:
+            property_value = np.array([value or np.nan for value in property_value], dtype=np.float64)
+        
+        # Calculate monthly payments, splitting out zero-rate loans
+        monthly_rate = interest_rate / 100 / 12
+        n_payments = loan_term_years * 12
+        with np.errstate(divide="ignore", invalid="ignore"):
+            monthly_payment = np.where(
+                monthly_rate >= 1e-12,
+                loan_amount * monthly_rate / -np.expm1(-n_payments * np.log1p(monthly_rate)),
+                loan_amount / n_payments
+            )
+        
+        # Calculate ratios
+        total_payments = monthly_payment * n_payments
+        total_interest = total_payments - loan_amount
+        monthly_income = income / 12
+        dti_before_loan = (monthly_debt / monthly_income) * 100
+        dti_after_loan = ((monthly_debt + monthly_payment) / monthly_income) * 100
+        loan_to_income = (loan_amount / income) * 100
+        payment_to_income = (monthly_payment / monthly_income) * 100
+        ltv = (loan_amount / property_value) * 100
+        dscr = monthly_income / (monthly_debt + monthly_payment)
+        
+        # Categorize with the same thresholds as analyze_loan
+        dti_bucket = np.digitize(dti_after_loan, _DTI_THRESHOLDS)
+        credit_bucket = np.digitize(credit_score, _CS_THRESHOLDS)
+        dti_risk = np.digitize(dti_after_loan, _DTI_RISK_THRESHOLDS, right=True)
+        risk_bucket = np.maximum(dti_risk, len(_CS_THRESHOLDS) - credit_bucket)
+        
+        rounded = np.round(np.column_stack((
+            monthly_payment, total_interest, total_payments, dti_before_loan, dti_after_loan,
+            loan_to_income, payment_to_income, ltv, dscr
+        )), 2).tolist()
+        
+        return [
+            {
+                "monthly_payment": payment,
+                "total_interest": interest,
+                "total_payments": payments,
+                "debt_to_income": {
+                    "before_loan": dti_before,
+                    "after_loan": dti_after,
+                    "category": _DTI_LABELS[dti_index]
+                },
+                "loan_to_income": lti,
+                "payment_to_income": pti,
+                "loan_to_value": loan_to_value if loan_to_value == loan_to_value else None,
+                "credit_score": {
+                    "value": score,
+                    "category": _CS_LABELS[credit_index]
+                },
+                "debt_service_coverage_ratio": coverage,
+                "overall_risk": _RISK_LEVELS[risk_index]
+            }
+            for (payment, interest, payments, dti_before, dti_after, lti, pti, loan_to_value, coverage),
+                score, dti_index, credit_index, risk_index in zip(
+                rounded, credit_score.tolist(), dti_bucket.tolist(),
+                credit_bucket.tolist(), risk_bucket.tolist()
+            )
+        ]
+    
+    def _normalize_inputs(self, income, loan_amount, loan_term_years, interest_rate, 
+                          credit_score, monthly_debt, property_value=None, extra_payment=0):
+        """Coerce loan inputs so equal scenarios share one cache entry"""
+        # Direct callers may pass 30 or 30.0; both must key and render identically
         income = float(income)
         loan_amount = float(loan_amount)
         loan_term_years = int(loan_term_years)
         interest_rate = float(interest_rate)
         credit_score = int(credit_score)
         monthly_debt = float(monthly_debt)
+        property_value = float(property_value) if property_value else None
+        extra_payment = float(extra_payment) if extra_payment else 0
         
-        # Convert property_value to float if provided
-        if property_value is not None:
-            if isinstance(property_value, str) and property_value.strip():
-                property_value = float(property_value)
-            elif not isinstance(property_value, str):
-                property_value = float(property_value) if property_value else None
-            else:
-                property_value = None
-        
+        return (income, loan_amount, loan_term_years, interest_rate,
+                credit_score, monthly_debt, property_value, extra_payment)
+    
+    def _compute_metrics(self, income, loan_amount, loan_term_years, interest_rate, credit_score,
+                         monthly_debt, property_value, extra_payment):
+        """Compute the loan ratios, categories and recommendations shared by all endpoints"""
         # Calculate basic loan metrics
         monthly_rate = interest_rate / 100 / 12
         n_payments = loan_term_years * 12
         
         # Calculate monthly payment
-        monthly_payment = loan_amount * (monthly_rate * (1 + monthly_rate) ** n_payments) / ((1 + monthly_rate) ** n_payments - 1)
+        monthly_payment = self._monthly_payment(loan_amount, monthly_rate, n_payments)
         
         # Calculate total interest
         total_interest = (monthly_payment * n_payments) - loan_amount
@@ -50,37 +242,23 @@ class LoanSystem:
         dti_after_loan = ((monthly_debt + monthly_payment) / monthly_income) * 100
         
         # Determine DTI category
-        dti_category = "critical"
-        if dti_after_loan < 28:
-            dti_category = "excellent"
-        elif dti_after_loan < 36:
-            dti_category = "good"
-        elif dti_after_loan < 43:
-            dti_category = "fair"
-        elif dti_after_loan < 50:
-            dti_category = "poor"
-            
+        dti_category = _DTI_LABELS[bisect_right(_DTI_THRESHOLDS, dti_after_loan)]
+        
         # Calculate other ratios
         loan_to_income = (loan_amount / income) * 100
         payment_to_income = (monthly_payment / monthly_income) * 100
         ltv = (loan_amount / property_value) * 100 if property_value else None
         
         # Determine credit score category
-        credit_category = "poor"
-        if credit_score >= 740:
-            credit_category = "excellent"
-        elif credit_score >= 670:
-            credit_category = "good"
-        elif credit_score >= 580:
-            credit_category = "fair"
-            
+        credit_bucket = bisect_right(_CS_THRESHOLDS, credit_score)
+        credit_category = _CS_LABELS[credit_bucket]
+        
         # Calculate debt service coverage ratio
         dscr = monthly_income / (monthly_debt + monthly_payment)
         
-        # Risk assessment
-        risk_level = "high" if dti_after_loan > 43 or credit_score < 580 else \
-                   "moderate" if dti_after_loan > 36 or credit_score < 670 else \
-                   "low_moderate" if dti_after_loan > 28 or credit_score < 740 else "low"
+        # Risk assessment: the worse of the DTI and credit score risk tiers
+        dti_risk = bisect_left(_DTI_RISK_THRESHOLDS, dti_after_loan)
+        risk_level = _RISK_LEVELS[max(dti_risk, len(_CS_THRESHOLDS) - credit_bucket)]
         
         # Generate recommendations
         recommendations = []
@@ -98,79 +276,117 @@ class LoanSystem:
         
         # Create risk factors
         risk_factors = {
-            "credit_score": {
-                "risk_level": "high" if credit_score < 580 else "moderate" if credit_score < 670 else "low",
-                "impact": "negative" if credit_score < 670 else "positive",
-                "suggestion": "Improve credit score" if credit_score < 670 else "Maintain excellent credit"
-            },
-            "debt_to_income": {
-                "risk_level": "high" if dti_after_loan > 43 else "moderate" if dti_after_loan > 36 else "low",
-                "impact": "negative" if dti_after_loan > 36 else "positive",
-                "suggestion": "Reduce debt or increase income" if dti_after_loan > 36 else "Maintain healthy DTI ratio"
-            }
+            "credit_score": dict(zip(_RF_KEYS, _CS_RISK[credit_bucket])),
+            "debt_to_income": dict(zip(_RF_KEYS, _DTI_RISK[dti_risk]))
         }
         
-        # Create a simple payment schedule
-        schedule = self._generate_simple_schedule(
+        return {
+            "monthly_rate": monthly_rate,
+            "monthly_payment": monthly_payment,
+            "total_interest": total_interest,
+            "total_payments": total_payments,
+            "dti_before_loan": dti_before_loan,
+            "dti_after_loan": dti_after_loan,
+            "dti_category": dti_category,
+            "loan_to_income": loan_to_income,
+            "payment_to_income": payment_to_income,
+            "ltv": ltv,
+            "credit_category": credit_category,
+            "dscr": dscr,
+            "risk_level": risk_level,
+            "risk_factors": risk_factors,
+            "recommendations": recommendations
+        }
+    
+    def _analyze(self, income, loan_amount, loan_term_years, interest_rate, credit_score,
+                 monthly_debt, property_value, extra_payment, include_rec_html):
+        """Run the loan analysis on normalized inputs and return it as JSON"""
+        metrics = self._metrics_cached(
+            income, loan_amount, loan_term_years, interest_rate, credit_score,
+            monthly_debt, property_value, extra_payment
+        )
+        monthly_payment = metrics["monthly_payment"]
+        
+        # Only the first payments and the summary are returned, so skip the full schedule
+        schedule_summary = self._schedule_summary_fast(
             loan_amount=loan_amount,
-            interest_rate=interest_rate,
+            monthly_rate=metrics["monthly_rate"],
+            monthly_payment=monthly_payment,
             loan_term_years=loan_term_years,
             extra_payment=extra_payment
         )
         
-        # Format AI recommendations
-        rec_text = f"""
-        <h3>Loan Assessment</h3>
-        <p>Based on your financial profile, this loan represents a {risk_level.replace('_', ' ')} risk. 
-        Your debt-to-income ratio is {dti_after_loan:.1f}%, which is considered {dti_category}.</p>
+        # Format AI recommendations only when the caller wants them
+        rec_text = self._format_rec_html(metrics, loan_term_years, extra_payment) if include_rec_html else None
         
-        <h3>Recommendations</h3>
-        <ul>
-        {"".join(f"<li>{rec}</li>" for rec in recommendations)}
-        </ul>
-        
-        <h3>Long-term Outlook</h3>
-        <p>With a monthly payment of ${monthly_payment:.2f}, you'll pay a total of ${total_interest:.2f} in interest 
-        over the {loan_term_years} year term. Making extra payments of ${extra_payment:.2f} per month could save you 
-        significantly in interest costs.</p>
-        """
+        # Round the display values in one pass
+        (monthly_payment, total_interest, total_payments, dti_before_loan, dti_after_loan,
+         loan_to_income, payment_to_income, dscr) = np.round(np.array([
+            monthly_payment, metrics["total_interest"], metrics["total_payments"],
+            metrics["dti_before_loan"], metrics["dti_after_loan"], metrics["loan_to_income"],
+            metrics["payment_to_income"], metrics["dscr"]
+        ]), 2).tolist()
+        ltv = metrics["ltv"]
         
         # Create response object
         response = {
             "analysis": {
-                "monthly_payment": round(monthly_payment, 2),
-                "total_interest": round(total_interest, 2),
-                "total_payments": round(total_payments, 2),
+                "monthly_payment": monthly_payment,
+                "total_interest": total_interest,
+                "total_payments": total_payments,
                 "debt_to_income": {
-                    "before_loan": round(dti_before_loan, 2),
-                    "after_loan": round(dti_after_loan, 2),
-                    "category": dti_category
+                    "before_loan": dti_before_loan,
+                    "after_loan": dti_after_loan,
+                    "category": metrics["dti_category"]
                 },
-                "loan_to_income": round(loan_to_income, 2),
-                "payment_to_income": round(payment_to_income, 2),
+                "loan_to_income": loan_to_income,
+                "payment_to_income": payment_to_income,
                 "loan_to_value": round(ltv, 2) if ltv else None,
                 "credit_score": {
                     "value": credit_score,
-                    "category": credit_category
+                    "category": metrics["credit_category"]
                 },
-                "debt_service_coverage_ratio": round(dscr, 2)
+                "debt_service_coverage_ratio": dscr
             },
             "risk": {
-                "risk_factors": risk_factors,
-                "overall_risk": risk_level,
-                "recommendations": recommendations
+                "risk_factors": metrics["risk_factors"],
+                "overall_risk": metrics["risk_level"],
+                "recommendations": metrics["recommendations"]
             },
-            "schedule_summary": schedule[:3] + [schedule[-1]] if len(schedule) > 4 else schedule,
+            "schedule_summary": schedule_summary,
             "visualization_available": False,
             "recommendations": rec_text
         }
         
-        return response
+        return orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY)
+    
+    def _format_rec_html(self, metrics, loan_term_years, extra_payment):
+        """Format the recommendation HTML shown by the recommendations endpoint"""
+        recommendations = metrics["recommendations"]
+        risk_level = metrics["risk_level"]
+        dti_after_loan = metrics["dti_after_loan"]
+        dti_category = metrics["dti_category"]
+        monthly_payment = metrics["monthly_payment"]
+        total_interest = metrics["total_interest"]
+        return f"""
+        <h3>Loan Assessment</h3>
+        <p>Based on your financial profile, this loan represents a {risk_level.replace('_', ' ')} risk. 
+        Your debt-to-income ratio is {dti_after_loan:.1f}%, which is considered {dti_category}.</p>
+        
+        <h3>Recommendations</h3>
+        <ul>
+        {"".join(f"<li>{rec}</li>" for rec in recommendations)}
+        </ul>
+        
+        <h3>Long-term Outlook</h3>
+        <p>With a monthly payment of ${monthly_payment:.2f}, you'll pay a total of ${total_interest:.2f} in interest 
+        over the {loan_term_years} year term. Making extra payments of ${extra_payment:.2f} per month could save you 
+        significantly in interest costs.</p>
+        """
     
     def get_visualization(self, *args, **kwargs):
         """Return a placeholder for visualization"""
-        # Return a simple 1x1 pixel transparent PNG in base64
-        return "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z/C/HgAGgwJ/lK3Q6wAAAABJRU5ErkJggg=="
+        return PLACEHOLDER_IMAGE_B64
     
     def get_enhanced_visualization(self, *args, **kwargs):
         """Return a placeholder for enhanced visualization"""
@@ -187,112 +403,120 @@ class LoanSystem:
     
     def get_recommendations(self, *args, **kwargs):
         """Get simple recommendations"""
-        analysis = self.analyze_loan(*args, **kwargs)
-        return analysis["recommendations"]
+        inputs = self._normalize_inputs(*args, **kwargs)
+        # Only the metrics feed the recommendations, so the schedule is never built
+        metrics = self._metrics_cached(*inputs)
+        return self._format_rec_html(metrics, loan_term_years=inputs[2], extra_payment=inputs[7])
+    
+    def _monthly_payment(self, loan_amount, monthly_rate, n_payments):
+        """Calculate the fixed monthly payment for an amortizing loan"""
+        if monthly_rate < 1e-12:
+            return loan_amount / n_payments
+        # 1 - (1+r)^-n via expm1/log1p stays accurate at very small rates
+        return loan_amount * monthly_rate / -math.expm1(-n_payments * math.log1p(monthly_rate))
+    
+    def _schedule_summary_fast(self, loan_amount, monthly_rate, monthly_payment, loan_term_years,
+                               extra_payment=0):
+        """Build the first three payments plus the summary without the full schedule"""
+        n_payments = loan_term_years * 12
+        payment_total = monthly_payment + extra_payment
+        
+        # Same kernel as the full schedule, so both endpoints report identical rows
+        interests, principals, balances = _amortize(
+            loan_amount, monthly_rate, payment_total, min(3, n_payments)
+        )
+        
+        schedule = self._payment_rows(interests, principals, balances, payment_total)
+        schedule.append(self._summary_entry(loan_amount, loan_term_years, monthly_payment, extra_payment))
+        return schedule
+    
+    def _payment_rows(self, interests, principals, balances, payment_total):
+        """Format amortization arrays as payment schedule entries"""
+        # Round every column in one pass
+        rows = np.round(np.column_stack((principals, interests, balances, np.cumsum(interests))), 2)
+        payment_amount = round(payment_total, 2)
+        return [
+            dict(zip(_PAY_KEYS, (i, _MONTH_STRINGS[(i-1)%12], payment_amount, *row)))
+            for i, row in enumerate(rows.tolist(), start=1)
+        ]
+    
+    def _summary_entry(self, loan_amount, loan_term_years, monthly_payment, extra_payment=0):
+        """Build the summary entry that closes a payment schedule"""
+        n_payments = loan_term_years * 12
+        
+        # FIX: Convert float to int for months_to_payoff
+        estimated_months = n_payments - (extra_payment * n_payments / (loan_amount / 3)) if extra_payment > 0 else n_payments
+        
+        return {
+            "payment_number": "summary",
+            "payment_date": None,
+            "payment_amount": round(monthly_payment * n_payments, 2),
+            "principal_payment": round(loan_amount, 2),
+            "interest_payment": round(monthly_payment * n_payments - loan_amount, 2),
+            "remaining_balance": 0,
+            "total_interest_paid": round(monthly_payment * n_payments - loan_amount, 2),
+            "years_to_payoff": loan_term_years - (extra_payment * loan_term_years / (loan_amount / 3)) if extra_payment > 0 else loan_term_years,
+            "months_to_payoff": int(estimated_months)  # Convert to int to fix the validation error
+        }
     
     def _generate_simple_schedule(self, loan_amount, interest_rate, loan_term_years, extra_payment=0):
         """Generate a simple payment schedule"""
-        schedule = []
-        remaining_balance = loan_amount
         monthly_rate = interest_rate / 100 / 12
         n_payments = loan_term_years * 12
         
         # Calculate monthly payment
-        monthly_payment = loan_amount * (monthly_rate * (1 + monthly_rate) ** n_payments) / ((1 + monthly_rate) ** n_payments - 1)
-        
-        # Initialize variables
-        total_interest = 0
-        payment_number = 1
+        monthly_payment = self._monthly_payment(loan_amount, monthly_rate, n_payments)
         
         # Generate schedule (first few payments and last payment)
         num_payments_to_generate = min(12, n_payments)
+        payment_total = monthly_payment + extra_payment
         
-        for i in range(1, num_payments_to_generate + 1):
-            # Calculate interest for this period
-            interest_payment = remaining_balance * monthly_rate
-            
-            # Calculate principal for this period
-            principal_payment = monthly_payment - interest_payment
-            
-            # Add extra payment if specified
-            total_principal_payment = principal_payment
-            if extra_payment > 0:
-                total_principal_payment += extra_payment
-            
-            # Update remaining balance
-            remaining_balance -= total_principal_payment
-            
-            # Handle final payment or negative balance
-            if remaining_balance < 0:
-                total_principal_payment += remaining_balance
-                remaining_balance = 0
-            
-            # Update total interest
-            total_interest += interest_payment
-            
-            # Add payment to schedule
-            payment = {
-                "payment_number": i,
-                "payment_date": f"2024-{((i-1)%12)+1:02d}-01",
-                "payment_amount": round(monthly_payment + extra_payment, 2),
-                "principal_payment": round(total_principal_payment, 2),
-                "interest_payment": round(interest_payment, 2),
-                "remaining_balance": round(remaining_balance, 2),
-                "total_interest_paid": round(total_interest, 2)
-            }
-            
-            schedule.append(payment)
-            
-            # Break if balance is zero
-            if remaining_balance <= 0:
-                break
+        interests, principals, balances = _amortize(
+            loan_amount, monthly_rate, payment_total, num_payments_to_generate
+        )
+        
+        remaining_balance = float(balances[-1])
+        total_interest = float(interests.sum())
+        
+        # Add payments to schedule
+        schedule = self._payment_rows(interests, principals, balances, payment_total)
         
         # Add last payment if we have a long loan
         if n_payments > 12 and remaining_balance > 0:
             # Calculate how many more payments based on remaining balance
-            payments_left = math.ceil(math.log(monthly_payment / (monthly_payment - remaining_balance * monthly_rate)) / math.log(1 + monthly_rate))
+            if not extra_payment:
+                payments_left = n_payments - num_payments_to_generate
+            elif monthly_rate:
+                payments_left = math.ceil(-math.log1p(-remaining_balance * monthly_rate / payment_total) / math.log1p(monthly_rate))
+            else:
+                payments_left = math.ceil(remaining_balance / payment_total)
             final_payment_number = payments_left + num_payments_to_generate
             
-            # Calculate interest for this period
-            interest_payment = remaining_balance * monthly_rate
-            
-            # Calculate principal for this period
-            principal_payment = monthly_payment - interest_payment
+            # Balance carried into the final payment
+            if monthly_rate:
+                growth = (1 + monthly_rate) ** (payments_left - 1)
+                total_principal_payment = remaining_balance * growth - payment_total * (growth - 1) / monthly_rate
+            else:
+                total_principal_payment = remaining_balance - payment_total * (payments_left - 1)
             
-            # Final payment may be different
-            total_principal_payment = remaining_balance
+            # Final payment clears the balance plus its interest
+            interest_payment = total_principal_payment * monthly_rate
             payment_amount = total_principal_payment + interest_payment
             
-            # Update total interest (approximate for final payment)
-            total_interest_estimate = total_interest + (payments_left - 1) * (remaining_balance * monthly_rate / 2)
+            # Everything paid after this point beyond the remaining balance is interest
+            total_interest_paid = total_interest + payment_total * (payments_left - 1) + payment_amount - remaining_balance
             
             # Add final payment to schedule
-            payment = {
-                "payment_number": final_payment_number,
-                "payment_date": f"Year {final_payment_number//12 + 1}, Month {final_payment_number%12 or 12}",
-                "payment_amount": round(payment_amount, 2),
-                "principal_payment": round(total_principal_payment, 2),
-                "interest_payment": round(interest_payment, 2),
-                "remaining_balance": 0,
-                "total_interest_paid": round(total_interest_estimate, 2)
-            }
-            
-            schedule.append(payment)
-        
-        # Add summary - FIX: Convert float to int for months_to_payoff
-        estimated_months = n_payments - (extra_payment * n_payments / (loan_amount / 3)) if extra_payment > 0 else n_payments
-        
-        summary = {
-            "payment_number": "summary",
-            "payment_date": None,
-            "payment_amount": round(monthly_payment * n_payments, 2),
-            "principal_payment": round(loan_amount, 2),
-            "interest_payment": round(monthly_payment * n_payments - loan_amount, 2),
-            "remaining_balance": 0,
-            "total_interest_paid": round(monthly_payment * n_payments - loan_amount, 2),
-            "years_to_payoff": loan_term_years - (extra_payment * loan_term_years / (loan_amount / 3)) if extra_payment > 0 else loan_term_years,
-            "months_to_payoff": int(estimated_months)  # Convert to int to fix the validation error
-        }
+            schedule.append(dict(zip(_PAY_KEYS, (
+                final_payment_number,
+                f"Year {final_payment_number//12 + 1}, Month {final_payment_number%12 or 12}",
+                round(payment_amount, 2),
+                round(total_principal_payment, 2),
+                round(interest_payment, 2),
+                0,
+                round(total_interest_paid, 2)
+            ))))
         
-        schedule.append(summary)
+        # Add summary
+        schedule.append(self._summary_entry(loan_amount, loan_term_years, monthly_payment, extra_payment))
         return schedule
\ No newline at end of file
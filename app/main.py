@@ -1,18 +1,30 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, Header, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 import os
+import hmac
+from contextlib import asynccontextmanager
 import base64
-from typing import Optional
+import orjson
+from typing import List, Optional
 
-from .models import LoanInputData, LoanResponse, VisualizationResponse
-from .loan_system import LoanSystem
+from .models import BatchAnalysisResponse, LoanInputData, LoanResponse, VisualizationResponse
+from .loan_system import LoanSystem, PLACEHOLDER_IMAGE_B64, warm_up
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Keep JIT compilation out of the first request's latency"""
+    warm_up()
+    yield
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Loan Guidance System API",
     description="API for analyzing loan scenarios and providing financial guidance",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,22 +36,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request, exc: RequestValidationError):
+    """Return 422 errors even when the rejected input is infinite or NaN"""
+    # orjson writes non-finite floats as null, where the default JSONResponse raises
+    return ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
+
 # Initialize loan system
 loan_system = LoanSystem()
 
+# Visualization body is constant, so encode it once at import
+PLACEHOLDER_RESPONSE = orjson.dumps({"image_data": PLACEHOLDER_IMAGE_B64})
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Loan Guidance System API"}
 
-@app.post("/analyze", response_model=LoanResponse)
+@app.post("/analyze", response_class=ORJSONResponse, responses={200: {"model": LoanResponse}})
 async def analyze_loan(data: LoanInputData):
     """
     Analyze a loan scenario and provide comprehensive guidance.
-    Returns full analysis with recommendations.
+    Returns the full analysis and risk assessment; the recommendations HTML
+    is null here and served by /recommendations.
     """
     try:
-        # Process the loan data
-        result = loan_system.analyze_loan(
+        # Process the loan data straight to JSON bytes, skipping response validation
+        result = loan_system.analyze_loan_json(
             income=data.income,
             loan_amount=data.loan_amount,
             loan_term_years=data.loan_term,
@@ -47,51 +69,53 @@ async def analyze_loan(data: LoanInputData):
             credit_score=data.credit_score,
             monthly_debt=data.monthly_debt,
             property_value=data.property_value,
-            extra_payment=data.extra_payment
+            extra_payment=data.extra_payment,
+            include_rec_html=False
         )
-        return result
+        return Response(content=result, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing loan: {str(e)}")
 
-@app.post("/visualization")
-async def get_visualization(data: LoanInputData):
+@app.post("/analyze-batch", response_class=ORJSONResponse, responses={200: {"model": BatchAnalysisResponse}})
+async def analyze_batch(items: List[LoanInputData]):
     """
-    Generate visualization for a loan scenario.
-    Returns base64 encoded image data.
+    Analyze several loan scenarios in one request.
+    Returns the core analysis and overall risk for each scenario, in order.
     """
     try:
-        # Generate visualization
-        visualization = loan_system.get_visualization(
-            loan_amount=data.loan_amount,
-            interest_rate=data.interest_rate,
-            loan_term_years=data.loan_term,
-            extra_payment=data.extra_payment
+        results = loan_system.analyze_batch(
+            income=[item.income for item in items],
+            loan_amount=[item.loan_amount for item in items],
+            loan_term_years=[item.loan_term for item in items],
+            interest_rate=[item.interest_rate for item in items],
+            credit_score=[item.credit_score for item in items],
+            monthly_debt=[item.monthly_debt for item in items],
+            property_value=[item.property_value for item in items]
         )
         
-        return VisualizationResponse(image_data=visualization)
+        return ORJSONResponse({"results": results})
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating visualization: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error analyzing loans: {str(e)}")
 
-@app.post("/enhanced-visualization")
+@app.post("/visualization", response_class=ORJSONResponse, responses={200: {"model": VisualizationResponse}})
+async def get_visualization(data: LoanInputData):
+    """
+    Generate visualization for a loan scenario.
+    Returns base64 encoded image data.
+    """
+    # Charts are not generated yet, so every scenario gets the same placeholder
+    return Response(content=PLACEHOLDER_RESPONSE, media_type="application/json")
+
+@app.post("/enhanced-visualization", response_class=ORJSONResponse, responses={200: {"model": VisualizationResponse}})
 async def get_enhanced_visualization(data: LoanInputData):
     """
     Generate enhanced visualization for a loan scenario.
     Returns base64 encoded image data with multiple charts.
     """
-    try:
-        # Generate enhanced visualization
-        visualization = loan_system.get_enhanced_visualization(
-            loan_amount=data.loan_amount,
-            interest_rate=data.interest_rate,
-            loan_term_years=data.loan_term,
-            extra_payment=data.extra_payment
-        )
-        
-        return VisualizationResponse(image_data=visualization)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating enhanced visualization: {str(e)}")
+    # Charts are not generated yet, so every scenario gets the same placeholder
+    return Response(content=PLACEHOLDER_RESPONSE, media_type="application/json")
 
-@app.post("/payment-schedule")
+@app.post("/payment-schedule", response_class=ORJSONResponse)
 async def get_payment_schedule(data: LoanInputData):
     """
     Generate a monthly payment schedule for a loan.
@@ -105,11 +129,11 @@ async def get_payment_schedule(data: LoanInputData):
             extra_payment=data.extra_payment
         )
         
-        return {"schedule": schedule}
+        return ORJSONResponse({"schedule": schedule})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating payment schedule: {str(e)}")
 
-@app.post("/recommendations")
+@app.post("/recommendations", response_class=ORJSONResponse)
 async def get_ai_recommendations(data: LoanInputData):
     """
     Get AI-powered personalized recommendations for a loan scenario.
@@ -126,10 +150,27 @@ async def get_ai_recommendations(data: LoanInputData):
             property_value=data.property_value
         )
         
-        return {"recommendations": recommendations}
+        return ORJSONResponse({"recommendations": recommendations})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating recommendations: {str(e)}")
 
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow admin endpoints only with the ADMIN_TOKEN from the environment"""
+    admin_token = os.environ.get("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/cache/clear", dependencies=[Depends(require_admin)])
+async def clear_cache():
+    """
+    Clear cached loan analyses in the worker that handles this request.
+    Each gunicorn worker keeps its own cache, so other workers are unaffected.
+    """
+    loan_system.clear_cache()
+    return {"status": "cleared", "worker_pid": os.getpid()}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
@@ -1,16 +1,43 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List, Dict, Any
 
 class LoanInputData(BaseModel):
     """Input model for loan analysis"""
-    income: float = Field(..., description="Annual income in dollars", example=85000)
-    loan_amount: float = Field(..., description="Loan amount in dollars", example=325000)
-    loan_term: int = Field(..., description="Loan term in years", example=30)
-    interest_rate: float = Field(..., description="Annual interest rate (percentage)", example=6.5)
-    credit_score: int = Field(..., description="Credit score (300-850)", example=720)
-    monthly_debt: float = Field(..., description="Monthly debt payments excluding mortgage", example=1200)
-    property_value: Optional[float] = Field(None, description="Property value in dollars (optional)", example=400000)
-    extra_payment: Optional[float] = Field(0, description="Extra monthly payment in dollars", example=0)
+    model_config = ConfigDict(
+        frozen=True,
+        allow_inf_nan=False,
+        json_schema_extra={
+            "examples": [
+                {
+                    "income": 85000,
+                    "loan_amount": 325000,
+                    "loan_term": 30,
+                    "interest_rate": 6.5,
+                    "credit_score": 720,
+                    "monthly_debt": 1200,
+                    "property_value": 400000,
+                    "extra_payment": 0
+                }
+            ]
+        }
+    )
+    
+    income: float = Field(..., gt=0, description="Annual income in dollars")
+    loan_amount: float = Field(..., gt=0, description="Loan amount in dollars")
+    loan_term: int = Field(..., ge=1, le=50, description="Loan term in years")
+    interest_rate: float = Field(..., ge=0, le=30, description="Annual interest rate (percentage)")
+    credit_score: int = Field(..., ge=300, le=850, description="Credit score (300-850)")
+    monthly_debt: float = Field(..., ge=0, description="Monthly debt payments excluding mortgage")
+    property_value: Optional[float] = Field(None, ge=0, description="Property value in dollars (optional)")
+    extra_payment: Optional[float] = Field(0, ge=0, description="Extra monthly payment in dollars")
+    
+    @field_validator("property_value", mode="before")
+    @classmethod
+    def blank_property_value(cls, value):
+        """Treat a blank property value from form inputs as not provided"""
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
 
 class RiskFactor(BaseModel):
     """Model for individual risk factor assessment"""
@@ -65,7 +92,15 @@ class LoanResponse(BaseModel):
     risk: RiskAssessment
     schedule_summary: List[PaymentEntry]
     visualization_available: bool = True
-    recommendations: str
+    recommendations: Optional[str] = None  # HTML is served by /recommendations
+
+class BatchAnalysisResult(AnalysisResult):
+    """Model for one scenario in a batch analysis"""
+    overall_risk: str
+
+class BatchAnalysisResponse(BaseModel):
+    """Response model for batch loan analysis"""
+    results: List[BatchAnalysisResult]
 
 class VisualizationResponse(BaseModel):
     """Response model for visualization endpoints"""
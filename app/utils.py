@@ -1,7 +1,27 @@
 import re
+import math
 from typing import Dict, List, Any, Optional
 import html
 
+# Formatting tags handled in a single pass: headers, paragraphs, list items, breaks
+_TAG_RE = re.compile(r'<h[1-6][^>]*>(.*?)</h[1-6]>|<p[^>]*>(.*?)</p>|<li[^>]*>(.*?)</li>|<br[^>]*>')
+_STRIP_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\n{3,}')
+
+def _format_tag(match: re.Match) -> str:
+    """Return the plaintext equivalent of a matched formatting tag"""
+    group = match.lastindex
+    if group is None:
+        return '\n'
+    
+    # Nested tags inside the element are converted as well
+    inner = _TAG_RE.sub(_format_tag, match.group(group))
+    if group == 1:
+        return f'** {inner} **\n'
+    if group == 2:
+        return f'{inner}\n\n'
+    return f'- {inner}\n'
+
 def sanitize_html(html_content: str) -> str:
     """
     Convert HTML content to plain text by removing HTML tags.
@@ -13,24 +33,14 @@ def sanitize_html(html_content: str) -> str:
     # First, decode any HTML entities
     decoded = html.unescape(html_content)
     
-    # Replace specific tags with plaintext equivalents
-    # Convert headers to text with asterisks
-    decoded = re.sub(r'<h[1-6][^>]*>(.*?)</h[1-6]>', r'** \1 **\n', decoded)
-    
-    # Convert paragraphs to text with newlines
-    decoded = re.sub(r'<p[^>]*>(.*?)</p>', r'\1\n\n', decoded)
-    
-    # Convert list items to text with dashes
-    decoded = re.sub(r'<li[^>]*>(.*?)</li>', r'- \1\n', decoded)
-    
-    # Convert break tags to newlines
-    decoded = re.sub(r'<br[^>]*>', '\n', decoded)
+    # Replace headers, paragraphs, list items and breaks with plaintext equivalents
+    decoded = _TAG_RE.sub(_format_tag, decoded)
     
     # Remove remaining HTML tags
-    decoded = re.sub(r'<[^>]+>', '', decoded)
+    decoded = _STRIP_RE.sub('', decoded)
     
     # Clean up excessive whitespace
-    decoded = re.sub(r'\n{3,}', '\n\n', decoded)
+    decoded = _WS_RE.sub('\n\n', decoded)
     decoded = decoded.strip()
     
     return decoded
@@ -47,6 +57,18 @@ def format_percentage(value: float) -> str:
         return "N/A"
     return f"{value:.2f}%"
 
+# (field, check, message) for each validate_loan_params argument, in signature order
+_LOAN_PARAM_RULES = (
+    ("income", lambda v: math.isfinite(v) and v > 0, "Income must be greater than zero"),
+    ("loan_amount", lambda v: math.isfinite(v) and v > 0, "Loan amount must be greater than zero"),
+    ("loan_term_years", lambda v: 0 < v <= 50, "Loan term must be between 1 and 50 years"),
+    ("interest_rate", lambda v: 0 <= v <= 30, "Interest rate must be between 0 and 30 percent"),
+    ("credit_score", lambda v: 300 <= v <= 850, "Credit score must be between 300 and 850"),
+    ("monthly_debt", lambda v: math.isfinite(v) and v >= 0, "Monthly debt cannot be negative"),
+    ("property_value", lambda v: v is None or (math.isfinite(v) and v > 0), "Property value must be greater than zero"),
+    ("extra_payment", lambda v: math.isfinite(v) and v >= 0, "Extra payment cannot be negative"),
+)
+
 def validate_loan_params(
     income: float, 
     loan_amount: float, 
@@ -60,32 +82,14 @@ def validate_loan_params(
     """
     Validate loan parameters and return error messages for any invalid values.
     Returns an empty dict if all values are valid.
-    """
-    errors = {}
-    
-    # Validate each parameter
-    if income <= 0:
-        errors["income"] = "Income must be greater than zero"
     
-    if loan_amount <= 0:
-        errors["loan_amount"] = "Loan amount must be greater than zero"
-    
-    if loan_term_years <= 0 or loan_term_years > 50:
-        errors["loan_term_years"] = "Loan term must be between 1 and 50 years"
-    
-    if interest_rate < 0 or interest_rate > 30:
-        errors["interest_rate"] = "Interest rate must be between 0 and 30 percent"
-    
-    if credit_score < 300 or credit_score > 850:
-        errors["credit_score"] = "Credit score must be between 300 and 850"
-    
-    if monthly_debt < 0:
-        errors["monthly_debt"] = "Monthly debt cannot be negative"
-    
-    if property_value is not None and property_value <= 0:
-        errors["property_value"] = "Property value must be greater than zero"
-    
-    if extra_payment < 0:
-        errors["extra_payment"] = "Extra payment cannot be negative"
-    
-    return errors
\ No newline at end of file
+    API requests are already checked by the LoanInputData field constraints;
+    this covers callers that use LoanSystem directly.
+    """
+    values = (income, loan_amount, loan_term_years, interest_rate,
+              credit_score, monthly_debt, property_value, extra_payment)
+    return {
+        field: message
+        for (field, is_valid, message), value in zip(_LOAN_PARAM_RULES, values)
+        if not is_valid(value)
+    }
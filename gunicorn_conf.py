@@ -0,0 +1,15 @@
+# gunicorn_conf.py - Production server settings
+#
+# Run with: gunicorn app.main:app -c gunicorn_conf.py
+
+import multiprocessing
+import os
+
+# Bind to the port provided by the platform (Render sets PORT)
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+
+# One worker per core; LoanSystem holds no shared state, so workers scale independently
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Uvicorn workers pick uvloop and httptools automatically when installed (uvicorn[standard])
+worker_class = "uvicorn.workers.UvicornWorker"